@@ -1,3 +1,11 @@
-from podcast2podcast.main import pipeline
+__all__ = ["apipeline_many", "pipeline", "pipeline_many"]
 
-__all__ = ["pipeline"]
+
+def __getattr__(name):
+    # the pipeline is imported on first use, so that lightweight modules (e.g.,
+    # podcast2podcast.text) can be imported without its heavy dependencies
+    if name in __all__:
+        from podcast2podcast import main
+
+        return getattr(main, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
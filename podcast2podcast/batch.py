@@ -0,0 +1,138 @@
+import json
+import time
+from typing import Dict, Iterator, Optional
+
+import openai
+import requests
+from loguru import logger
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _session(api_key: Optional[str]) -> requests.Session:
+    session = requests.Session()
+    api_key = api_key or openai.util.default_api_key()
+    session.headers["Authorization"] = f"Bearer {api_key}"
+    return session
+
+
+def _url(api_base: Optional[str], path: str) -> str:
+    return (api_base or openai.api_base).rstrip("/") + path
+
+
+def _read_jsonl(session, api_base, file_id) -> Iterator[dict]:
+    resp = session.get(_url(api_base, f"/files/{file_id}/content"))
+    resp.raise_for_status()
+    for line in resp.text.splitlines():
+        yield json.loads(line)
+
+
+def submit_batch(
+    bodies: Dict[str, dict],
+    endpoint: str = "/v1/completions",
+    api_key: Optional[str] = None,
+    api_base: Optional[str] = None,
+) -> str:
+    """Submit requests to the OpenAI Batch API.
+
+    Args:
+        bodies (Dict[str, dict]): Request bodies keyed by custom ID.
+        endpoint (str, optional): API endpoint for every request. Defaults to
+            "/v1/completions".
+        api_key (str, optional): OpenAI API key. Defaults to `openai.api_key`.
+        api_base (str, optional): OpenAI API base URL. Defaults to
+            `openai.api_base`.
+
+    Raises:
+        requests.exceptions.HTTPError: If the batch could not be submitted.
+
+    Returns:
+        str: The batch ID.
+
+    """
+    jsonl = "\n".join(
+        json.dumps({"custom_id": i, "method": "POST", "url": endpoint, "body": b})
+        for i, b in bodies.items()
+    )
+
+    session = _session(api_key)
+    resp = session.post(
+        _url(api_base, "/files"),
+        data={"purpose": "batch"},
+        files={"file": ("batch.jsonl", jsonl.encode())},
+    )
+    resp.raise_for_status()
+    input_file_id = resp.json()["id"]
+
+    resp = session.post(
+        _url(api_base, "/batches"),
+        json={
+            "input_file_id": input_file_id,
+            "endpoint": endpoint,
+            "completion_window": "24h",
+        },
+    )
+    resp.raise_for_status()
+    batch_id = resp.json()["id"]
+    logger.info("Submitted batch {} ({} requests)", batch_id, len(bodies))
+
+    return batch_id
+
+
+def wait_for_batch(
+    batch_id: str,
+    poll_interval: float = 30.0,
+    api_key: Optional[str] = None,
+    api_base: Optional[str] = None,
+) -> Dict[str, dict]:
+    """Wait for a batch to finish and collect its responses.
+
+    Args:
+        batch_id (str): The batch ID.
+        poll_interval (float, optional): Seconds between status checks.
+            Defaults to 30.
+        api_key (str, optional): OpenAI API key. Defaults to `openai.api_key`.
+        api_base (str, optional): OpenAI API base URL. Defaults to
+            `openai.api_base`.
+
+    Raises:
+        RuntimeError: If the batch or any of its requests did not complete.
+        requests.exceptions.HTTPError: If the batch could not be retrieved.
+
+    Returns:
+        Dict[str, dict]: Response bodies keyed by custom ID.
+
+    """
+    session = _session(api_key)
+    while True:
+        resp = session.get(_url(api_base, f"/batches/{batch_id}"))
+        resp.raise_for_status()
+        batch = resp.json()
+        if batch["status"] in TERMINAL_STATUSES:
+            break
+        logger.info("Batch {} is {}...", batch_id, batch["status"])
+        time.sleep(poll_interval)
+
+    if batch["status"] != "completed":
+        raise RuntimeError(f"Batch {batch_id} is {batch['status']}")
+
+    # in a completed batch, failed requests are written to a separate error file,
+    # and the output file is absent if every request failed
+    results = []
+    for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+        if file_id is not None:
+            results.extend(_read_jsonl(session, api_base, file_id))
+
+    responses, errors = {}, {}
+    for result in results:
+        if result["error"] is not None or result["response"]["status_code"] != 200:
+            errors[result["custom_id"]] = result["error"] or result["response"]["body"]
+        else:
+            responses[result["custom_id"]] = result["response"]["body"]
+
+    if errors:
+        raise RuntimeError(
+            f"Batch {batch_id}: requests {', '.join(sorted(errors))} failed: {errors}"
+        )
+
+    return responses
@@ -0,0 +1,65 @@
+from typing import Optional
+
+import langchain
+from langchain.cache import SQLiteCache
+from langchain.llms.base import BaseLLM
+from langchain.schema import Generation
+
+DEFAULT_CACHE_PATH = ".openai_cache.db"
+
+
+def set_cache(enabled: bool, database_path: str = DEFAULT_CACHE_PATH):
+    """Turn on or off caching of OpenAI completions.
+
+    Completions are stored on disk, keyed by the prompt and the model parameters,
+    so that re-running the pipeline on the same episode does not pay for
+    identical requests again.
+
+    Args:
+        enabled (bool): Whether to cache completions.
+        database_path (str, optional): Path to the SQLite cache. Defaults to
+            ".openai_cache.db".
+
+    """
+    langchain.llm_cache = SQLiteCache(database_path=database_path) if enabled else None
+
+
+def lookup(prompt: str, llm: BaseLLM) -> Optional[str]:
+    """Look up a cached completion made outside of an LLMChain.
+
+    Entries are shared with completions made through an LLMChain on `llm`.
+
+    Args:
+        prompt (str): The prompt.
+        llm (BaseLLM): The LLM whose parameters the completion was made with.
+
+    Returns:
+        Optional[str]: The cached completion text, if caching is enabled and the
+            prompt has been seen with the same parameters.
+
+    """
+    if langchain.llm_cache is None:
+        return None
+    generations = langchain.llm_cache.lookup(prompt, _llm_string(llm))
+    return generations[0].text if generations else None
+
+
+def update(prompt: str, llm: BaseLLM, text: str):
+    """Cache a completion made outside of an LLMChain.
+
+    Args:
+        prompt (str): The prompt.
+        llm (BaseLLM): The LLM whose parameters the completion was made with.
+        text (str): The completion text.
+
+    """
+    if langchain.llm_cache is not None:
+        langchain.llm_cache.update(prompt, _llm_string(llm), [Generation(text=text)])
+
+
+def _llm_string(llm: BaseLLM) -> str:
+    # built the same way as in BaseLLM.generate, which LLMChain calls without a
+    # stop argument
+    params = llm.dict()
+    params["stop"] = None
+    return str(sorted([(k, v) for k, v in params.items()]))
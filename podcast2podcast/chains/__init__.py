@@ -0,0 +1,54 @@
+from contextlib import asynccontextmanager
+
+import aiohttp
+import openai
+from loguru import logger
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+_backoff = wait_random_exponential(multiplier=1, max=60)
+
+
+def _wait(retry_state) -> float:
+    # honor the server's Retry-After header (e.g., on rate limits) if present,
+    # otherwise back off with jitter, so that concurrent requests which fail
+    # together do not all retry together
+    try:
+        return float(retry_state.outcome.exception().headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return _backoff(retry_state)
+
+
+# the same transient errors that langchain's OpenAI LLM retries
+openai_retry = retry(
+    retry=retry_if_exception_type(
+        (
+            openai.error.RateLimitError,
+            openai.error.APIConnectionError,
+            openai.error.Timeout,
+            openai.error.APIError,
+            openai.error.ServiceUnavailableError,
+        )
+    ),
+    wait=_wait,
+    stop=stop_after_attempt(6),
+    before_sleep=lambda s: logger.warning("Retrying: {}", s.outcome.exception()),
+    reraise=True,
+)
+
+
+@asynccontextmanager
+async def openai_aiosession():
+    """Share one connection pool across the async completions in this context."""
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=64)
+    ) as session:
+        token = openai.aiosession.set(session)
+        try:
+            yield session
+        finally:
+            openai.aiosession.reset(token)
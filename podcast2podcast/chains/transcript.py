@@ -1,5 +1,12 @@
+from typing import List, Tuple
+
+import openai
 from langchain import LLMChain, OpenAI, PromptTemplate
 
+from podcast2podcast import cache
+from podcast2podcast.batch import submit_batch, wait_for_batch
+from podcast2podcast.chains import openai_retry
+
 TAGLINE = "That's all for today. Join us next time for another exciting summary."
 
 FIRST_LINE = """Welcome back. I'm JeremyBot, an artificial intelligence that summarizes \
@@ -7,16 +14,19 @@ podcasts. Today we are summarizing {podcast_name}: {episode_name}"""
 
 PROMPT_TEMPLATE_STR = """\
 Please write dialog for a talk show where the host, "JeremyBot," discusses and \
-summarizes a podcast. There are no guests on this show. Make sure to end with the \
-tagline: "{tagline}"
+summarizes a podcast episode from its description. There are no guests on this \
+show. Only discuss the content of the episode. For example, ignore links to the \
+podcast's website, social media accounts, sponsors and background reading. Make \
+sure to end with the tagline: "{tagline}"
 
-For example, consider the following summary.
+For example, consider the following description.
 
-Summary: This week on the Slate Gabfest, David Plotz, Emily Bazelon, and John \
+Description: This week on the Slate Gabfest, David Plotz, Emily Bazelon, and John \
 Dickerson discuss the House GOP's "Weaponization of Government" subcommittee, \
 the insurrection in Brazil, Prince Harry's book "Spare", and the status of \
 "return to office". They also provide references and chatters from John, Emily, \
-David, and a listener.
+David, and a listener. Follow us on Twitter @SlateGabfest. This podcast is \
+brought to you by Slate Plus: sign up at slate.com/gabfestplus.
 
 Dialog: Welcome! Today we are summarizing The Slate Political Gabfest. On \
 this episode, David Plotz, Emily Bazelon, and John Dickerson discuss the House \
@@ -25,41 +35,160 @@ Prince Harry's book 'Spare', and the status of 'return to office'. They also \
 provide references and chatters from John, Emily, David, and a listener. \
 {tagline}
 
-Summary: {summary}
+Description: {description}
 
 Dialog: """
 
 PROMPT_TEMPLATE_STR += FIRST_LINE
 
 transcript_template = PromptTemplate(
-    input_variables=["summary", "tagline", "podcast_name", "episode_name"],
+    input_variables=["description", "tagline", "podcast_name", "episode_name"],
     template=PROMPT_TEMPLATE_STR,
 ).partial(tagline=TAGLINE)
 
 transcript_chain = LLMChain(
-    llm=OpenAI(temperature=0.0, model_kwargs={"stop": [TAGLINE]}),
+    llm=OpenAI(
+        temperature=0.0,
+        model_kwargs={"stop": [TAGLINE]},
+        request_timeout=15,
+        max_retries=0,
+    ),
     prompt=transcript_template,
 )
 
 
-def generate_transcript(podcast_name: str, episode_name: str, summary: str) -> str:
-    """Generate dialog from a podcast summary.
+@openai_retry
+def generate_transcript(podcast_name: str, episode_name: str, description: str) -> str:
+    """Generate dialog from a podcast description.
+
+    Summarizing the description and writing the dialog happen in a single
+    completion, rather than summarizing first in a separate request.
 
     Args:
-        summary (str): The podcast summary.
+        description (str): The podcast description.
 
     Returns:
         str: The dialog.
 
     """
+    episode_info = _episode_info(podcast_name, episode_name)
+    llm_output = transcript_chain.predict(description=description, **episode_info)
+    return _full_output(episode_info, llm_output)
+
+
+@openai_retry
+async def agenerate_transcripts(
+    podcast_name: str, episodes: List[Tuple[str, str]]
+) -> List[str]:
+    """Generate dialog for several podcast descriptions in a single request.
+
+    The OpenAI completions endpoint accepts a list of prompts, so this costs one
+    round trip rather than one per episode. Keep `episodes` to a few dozen so the
+    request fits within the rate limit.
+
+    Args:
+        podcast_name (str): The podcast title.
+        episodes (List[Tuple[str, str]]): Episode titles and descriptions.
+
+    Returns:
+        List[str]: The dialogs, in the same order as `episodes`.
 
+    """
+    params = _completion_params()
+    episode_infos = [_episode_info(podcast_name, name) for name, _ in episodes]
+    prompts = [
+        transcript_template.format(description=d, **info)
+        for info, (_, d) in zip(episode_infos, episodes)
+    ]
+
+    llm_outputs = [cache.lookup(prompt, transcript_chain.llm) for prompt in prompts]
+    missing = [i for i, o in enumerate(llm_outputs) if o is None]
+    if missing:
+        # the request takes as long as its slowest completion, and a timeout
+        # re-sends every prompt, so allow a single prompt's timeout for each
+        response = await openai.Completion.acreate(
+            prompt=[prompts[i] for i in missing],
+            request_timeout=transcript_chain.llm.request_timeout * len(missing),
+            api_key=transcript_chain.llm.openai_api_key,
+            api_base=transcript_chain.llm.openai_api_base,
+            **params,
+        )
+        # choices are not guaranteed to come back in prompt order
+        choices = sorted(response["choices"], key=lambda c: c["index"])
+        for i, choice in zip(missing, choices):
+            llm_outputs[i] = choice["text"]
+            cache.update(prompts[i], transcript_chain.llm, choice["text"])
+
+    return [_full_output(info, o) for info, o in zip(episode_infos, llm_outputs)]
+
+
+def generate_transcripts_batch(
+    podcast_name: str, episodes: List[Tuple[str, str]]
+) -> List[str]:
+    """Generate dialog for several podcast descriptions with the Batch API.
+
+    Batched requests are half the price of synchronous ones and do not count
+    against the regular rate limit, but may take up to 24 hours to complete.
+    Prompts with a cached completion are not resubmitted.
+
+    Args:
+        podcast_name (str): The podcast title.
+        episodes (List[Tuple[str, str]]): Episode titles and descriptions.
+
+    Raises:
+        RuntimeError: If the batch, or any episode's request in it, failed.
+
+    Returns:
+        List[str]: The dialogs, in the same order as `episodes`.
+
+    """
+    llm = transcript_chain.llm
+    params = _completion_params()
+    episode_infos = [_episode_info(podcast_name, name) for name, _ in episodes]
+    prompts = [
+        transcript_template.format(description=d, **info)
+        for info, (_, d) in zip(episode_infos, episodes)
+    ]
+
+    llm_outputs = [cache.lookup(prompt, llm) for prompt in prompts]
+    bodies = {
+        str(i): {"prompt": prompts[i], **params}
+        for i, o in enumerate(llm_outputs)
+        if o is None
+    }
+    if bodies:
+        api = {"api_key": llm.openai_api_key, "api_base": llm.openai_api_base}
+        responses = wait_for_batch(submit_batch(bodies, **api), **api)
+        missing = sorted(set(bodies) - set(responses))
+        if missing:
+            raise RuntimeError(f"Batch returned no response for requests {missing}")
+        for custom_id, response in responses.items():
+            i = int(custom_id)
+            llm_outputs[i] = response["choices"][0]["text"]
+            cache.update(prompts[i], llm, llm_outputs[i])
+
+    return [_full_output(info, o) for info, o in zip(episode_infos, llm_outputs)]
+
+
+def _completion_params() -> dict:
+    llm = transcript_chain.llm
+    return {
+        "model": llm.model_name,
+        "temperature": llm.temperature,
+        "max_tokens": llm.max_tokens,
+        **llm.model_kwargs,
+    }
+
+
+def _episode_info(podcast_name: str, episode_name: str) -> dict:
     # ensure punctuation mark between the end of the prompt and the beginning
     # of the model prediction
     if not any(episode_name.endswith(punc) for punc in ".!?"):
         episode_name = episode_name + "."
 
-    episode_info = {"episode_name": episode_name, "podcast_name": podcast_name}
-    llm_output = transcript_chain.predict(summary=summary, **episode_info).strip()
-    full_output = FIRST_LINE.format(**episode_info) + " " + llm_output + " " + TAGLINE
+    return {"episode_name": episode_name, "podcast_name": podcast_name}
+
 
-    return full_output
+def _full_output(episode_info: dict, llm_output: str) -> str:
+    first_line = FIRST_LINE.format(**episode_info)
+    return first_line + " " + llm_output.strip() + " " + TAGLINE
@@ -1,7 +1,16 @@
+import asyncio
+import re
+from typing import List, Tuple
+
 from loguru import logger
 
-from podcast2podcast.chains.summarize import generate_summary
-from podcast2podcast.chains.transcript import generate_transcript
+from podcast2podcast.chains.transcript import (
+    agenerate_transcripts,
+    generate_transcript,
+    generate_transcripts_batch,
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
 def new_dialog(podcast_title, episode_title, description) -> str:
@@ -16,12 +25,44 @@ def new_dialog(podcast_title, episode_title, description) -> str:
         str: The new dialog transcript.
 
     """
+    description = _WHITESPACE_RE.sub(" ", description).strip()
     logger.info("Description: {}", description)
 
-    summary = generate_summary(description)
-    logger.info("Summary: {}", summary)
-
-    transcript = generate_transcript(podcast_title, episode_title, summary)
+    transcript = generate_transcript(podcast_title, episode_title, description)
     logger.info("Transcript: {}", transcript)
 
     return transcript
+
+
+async def anew_dialogs(
+    podcast_title: str, episodes: List[Tuple[str, str]], batch_api: bool = False
+) -> List[str]:
+    """Create dialog transcripts for several episodes.
+
+    All episodes' prompts are sent together, in one completions request or, if
+    `batch_api` is set, one OpenAI Batch API job.
+
+    Args:
+        podcast_title (str): The podcast title.
+        episodes (List[Tuple[str, str]]): Episode titles and descriptions.
+        batch_api (bool, optional): Submit the prompts to the OpenAI Batch API,
+            which is cheaper but slower, for offline jobs. Defaults to False.
+
+    Returns:
+        List[str]: The new dialog transcripts, in the same order as `episodes`.
+
+    """
+    episodes = [(t, _WHITESPACE_RE.sub(" ", d).strip()) for t, d in episodes]
+    for title, description in episodes:
+        logger.info("Description ({}): {}", title, description)
+
+    if batch_api:
+        transcripts = await asyncio.to_thread(
+            generate_transcripts_batch, podcast_title, episodes
+        )
+    else:
+        transcripts = await agenerate_transcripts(podcast_title, episodes)
+    for (title, _), transcript in zip(episodes, transcripts):
+        logger.info("Transcript ({}): {}", title, transcript)
+
+    return transcripts
@@ -1,9 +1,14 @@
-from typing import TYPE_CHECKING, Literal, Union
+import asyncio
+import os
+from typing import TYPE_CHECKING, List, Literal, Optional, Union
 
-from podcast2podcast.dialog import new_dialog
+from podcast2podcast.cache import set_cache
+from podcast2podcast.chains import openai_aiosession
+from podcast2podcast.dialog import anew_dialogs, new_dialog
 from podcast2podcast.rss import parse_rss
 from podcast2podcast.tts.google import tts as google_tts
 from podcast2podcast.tts.tortoise import tts as tortoise_tts
+from podcast2podcast.tts.tortoise import tts_to_file as tortoise_tts_to_file
 from podcast2podcast.utils import yap
 
 if TYPE_CHECKING:
@@ -14,6 +19,8 @@ def pipeline(
     url,
     episode_idx: Union[str, int],
     tts_method: Literal["google", "tortoise", None] = "tortoise",
+    use_cache: bool = True,
+    fp_out: Optional[str] = None,
 ) -> Union[str, "AudioSegment"]:
     """Run the entire pipeline (transcription to spoken output).
 
@@ -22,25 +29,21 @@ def pipeline(
         episode_idx (int | str): Episode index within RSS feed: either the episode number or the episode title.
         tts_method(str, optional): Text-to-speech method. Defaults to "google".
             If None, skip TTS.
+        use_cache (bool, optional): Reuse OpenAI completions from previous runs
+            with identical prompts. Defaults to True.
+        fp_out (str, optional): Write the audio to this file (e.g., an mp3)
+            instead of returning it. TorToiSe audio is streamed to disk rather
+            than held in memory.
 
     Returns:
-        AudioSegment: Audio of podcast episode.
+        AudioSegment | str: Audio of podcast episode, or `fp_out` if given.
 
     """
+    set_cache(use_cache)
 
     with yap(about="getting podcast information"):
-        podcast_title, episodes = parse_rss(url, episode_idx)
-        try:
-            assert isinstance(
-                episode_idx, int
-            ), "episode_idx must be an integer to index on the episode list"
-            episode_title, episode_description = episodes[episode_idx]
-        except (TypeError, AssertionError):
-            assert isinstance(
-                episode_idx, str
-            ), "episode_idx must be a string search for an episode"
-            (episode,) = [e for e in episodes if e.title.lower() == episode_idx.lower()]
-            episode_title, episode_description = episode
+        podcast_title, episodes = parse_rss(url)
+        episode_title, episode_description = _select_episode(episodes, episode_idx)
 
     with yap(about="creating new dialog"):
         transcript = new_dialog(podcast_title, episode_title, episode_description)
@@ -49,11 +52,192 @@ def pipeline(
         return transcript
 
     with yap(about="generating audio"):
-        if tts_method == "google":
-            audio = google_tts(transcript)
-        elif tts_method == "tortoise":
-            audio = tortoise_tts(transcript, preset="high_quality")
-        else:
-            raise ValueError(tts_method)
+        audio = _tts(transcript, tts_method, fp_out)
 
     return audio
+
+
+def pipeline_many(
+    url,
+    episode_idxs: List[Union[str, int]],
+    tts_method: Literal["google", "tortoise", None] = "tortoise",
+    batch_size: int = 20,
+    concurrency: int = 4,
+    batch_api: bool = False,
+    use_cache: bool = True,
+    fp_outs: Optional[List[str]] = None,
+) -> List[Union[str, "AudioSegment"]]:
+    """Run the entire pipeline for several episodes of the same podcast.
+
+    This is a synchronous wrapper around `apipeline_many` for scripts. From a
+    notebook, or anywhere else an event loop is already running, use
+    `await apipeline_many(...)` instead.
+
+    Args:
+        url (str): URL to audio file.
+        episode_idxs (List[int | str]): Episode indices within RSS feed: either the
+            episode numbers or the episode titles.
+        tts_method(str, optional): Text-to-speech method. Defaults to "tortoise".
+            If None, skip TTS.
+        batch_size (int, optional): Number of episodes whose dialog is generated
+            in a single OpenAI request. Defaults to 20.
+        concurrency (int, optional): Maximum number of OpenAI requests in flight
+            at once, to stay within the rate limit. Defaults to 4.
+        batch_api (bool, optional): Generate dialog with the OpenAI Batch API.
+            Defaults to False.
+        use_cache (bool, optional): Reuse OpenAI completions from previous runs
+            with identical prompts. Defaults to True.
+        fp_outs (List[str], optional): Write each episode's audio to the file at
+            the same position, instead of returning it.
+
+    Raises:
+        RuntimeError: If called from a running event loop.
+
+    Returns:
+        List[AudioSegment | str]: Audio of podcast episodes, or their paths if
+            `fp_outs` is given, in the same order as `episode_idxs`.
+
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(
+            apipeline_many(
+                url,
+                episode_idxs,
+                tts_method,
+                batch_size,
+                concurrency,
+                batch_api,
+                use_cache,
+                fp_outs,
+            )
+        )
+    raise RuntimeError(
+        "pipeline_many cannot be called from a running event loop (e.g., a "
+        "notebook). Use `await apipeline_many(...)` instead."
+    )
+
+
+async def apipeline_many(
+    url,
+    episode_idxs: List[Union[str, int]],
+    tts_method: Literal["google", "tortoise", None] = "tortoise",
+    batch_size: int = 20,
+    concurrency: int = 4,
+    batch_api: bool = False,
+    use_cache: bool = True,
+    fp_outs: Optional[List[str]] = None,
+) -> List[Union[str, "AudioSegment"]]:
+    """Run the entire pipeline for several episodes of the same podcast.
+
+    Dialog generation (network-bound) and text-to-speech (GPU-bound) run as
+    overlapping stages: an episode's audio is generated while the dialog for
+    later episodes is still being written. Dialog is generated for `batch_size`
+    episodes per OpenAI request.
+
+    Args:
+        url (str): URL to audio file.
+        episode_idxs (List[int | str]): Episode indices within RSS feed: either the
+            episode numbers or the episode titles.
+        tts_method(str, optional): Text-to-speech method. Defaults to "tortoise".
+            If None, skip TTS.
+        batch_size (int, optional): Number of episodes whose dialog is generated
+            in a single OpenAI request. Defaults to 20.
+        concurrency (int, optional): Maximum number of OpenAI requests in flight
+            at once, to stay within the rate limit. Defaults to 4.
+        batch_api (bool, optional): Generate dialog with the OpenAI Batch API,
+            which is half the price but may take up to 24 hours. All episodes go
+            in one batch, so text-to-speech starts once the batch completes.
+            Defaults to False.
+        use_cache (bool, optional): Reuse OpenAI completions from previous runs
+            with identical prompts. Defaults to True.
+        fp_outs (List[str], optional): Write each episode's audio to the file at
+            the same position, instead of returning it.
+
+    Raises:
+        ValueError: If `fp_outs` and `episode_idxs` differ in length.
+        ExceptionGroup: If creating any of the episodes failed.
+
+    Returns:
+        List[AudioSegment | str]: Audio of podcast episodes, or their paths if
+            `fp_outs` is given, in the same order as `episode_idxs`.
+
+    """
+    if fp_outs is not None and len(fp_outs) != len(episode_idxs):
+        raise ValueError(
+            f"Got {len(fp_outs)} output paths for {len(episode_idxs)} episodes"
+        )
+
+    set_cache(use_cache)
+
+    with yap(about="getting podcast information"):
+        podcast_title, episodes = await asyncio.to_thread(parse_rss, url)
+        selected = [_select_episode(episodes, idx) for idx in episode_idxs]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transcripts = asyncio.Queue()
+    results = [None] * len(selected)
+
+    if batch_api:
+        batch_size = max(len(selected), 1)
+
+    async def dialog_worker(idxs):
+        async with semaphore:
+            batch = await anew_dialogs(
+                podcast_title, [selected[i] for i in idxs], batch_api
+            )
+        for i, transcript in zip(idxs, batch):
+            await transcripts.put((i, transcript))
+
+    async def tts_worker():
+        # the GPU is the serial resource, so only one episode is spoken at a time
+        for _ in selected:
+            i, transcript = await transcripts.get()
+            if tts_method is None:
+                results[i] = transcript
+            else:
+                fp_out = None if fp_outs is None else fp_outs[i]
+                results[i] = await asyncio.to_thread(
+                    _tts, transcript, tts_method, fp_out
+                )
+
+    # the task group cancels and awaits the remaining workers if one fails, before
+    # the shared session is closed
+    with yap(about=f"creating {len(selected)} new episodes"):
+        async with openai_aiosession(), asyncio.TaskGroup() as tg:
+            tg.create_task(tts_worker())
+            for i in range(0, len(selected), batch_size):
+                idxs = range(i, min(i + batch_size, len(selected)))
+                tg.create_task(dialog_worker(idxs))
+
+    return results
+
+
+def _select_episode(episodes, episode_idx):
+    try:
+        assert isinstance(
+            episode_idx, int
+        ), "episode_idx must be an integer to index on the episode list"
+        return episodes[episode_idx]
+    except (TypeError, AssertionError):
+        assert isinstance(
+            episode_idx, str
+        ), "episode_idx must be a string search for an episode"
+        (episode,) = [e for e in episodes if e[0].lower() == episode_idx.lower()]
+        return episode
+
+
+def _tts(transcript, tts_method, fp_out=None):
+    if tts_method == "google":
+        audio = google_tts(transcript)
+        if fp_out is None:
+            return audio
+        audio.export(fp_out, format=os.path.splitext(fp_out)[1].lstrip("."))
+    elif tts_method == "tortoise":
+        if fp_out is None:
+            return tortoise_tts(transcript, preset="high_quality")
+        tortoise_tts_to_file(transcript, fp_out, preset="high_quality")
+    else:
+        raise ValueError(tts_method)
+    return fp_out
@@ -50,7 +50,7 @@ def parse_rss(rss_url: str) -> Tuple[str, List[Tuple[str, str]]]:
         for e in xml.rss.channel.item:
             title = unidecode(e.title.cdata)
             description = TagStripper.from_html(unidecode(e.description.cdata))
-            episodes.append(title, description)
+            episodes.append((title, description))
     except (SAXParseException, AttributeError):
         raise ValueError(f"Could not parse {rss_url}")
 
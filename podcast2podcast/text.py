@@ -0,0 +1,47 @@
+def break_up_long_sentence(sent: str, max_chars: int = 400):
+    """Split texts into reasonable sizes.
+
+    Args:
+        sent (str): A potentially long sentence.
+        max_chars (int, optional): Clauses longer than this are split between
+            words, since Tortoise fails on long texts. Defaults to 400.
+
+    Examples:
+        >>> break_up_long_sentence(
+        >>>     "It was the best of times, it was the worst of times, it was the age of wisdom, "
+        >>>     "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
+        >>>     "incredulity, it was the season of light, it was the season of darkness, it was "
+        >>>     "the spring of hope, it was the winter of despair."
+        >>> )
+        ["It was the best of times, it was the worst of times, it was the age of wisdom,",
+         "it was the age of foolishness, it was the epoch of belief,",
+         "it was the epoch of incredulity, it was the season of light,",
+         "it was the season of darkness, it was the spring of hope, it was the winter of despair."]
+
+    Returns:
+        List[str]: List of clauses or a sentence of a reasonable size.
+
+    """
+    chunks = []
+
+    def split(s):
+        if not s.strip(" ,"):
+            return
+        if s.count(" ") < 25 and len(s) <= max_chars:
+            chunks.append(s.strip())
+            return
+        # a single clause with a trailing comma would otherwise split into itself
+        if len([c for c in s.rstrip(",").split(",") if c.strip()]) > 1:
+            clauses = s.split(",")
+            split(",".join(clauses[: len(clauses) // 2]).strip() + ",")
+            split(",".join(clauses[len(clauses) // 2 :]).strip())
+            return
+        words = s.split()
+        if len(s) <= max_chars or len(words) == 1:
+            chunks.append(s.strip())
+            return
+        split(" ".join(words[: len(words) // 2]))
+        split(" ".join(words[len(words) // 2 :]))
+
+    split(sent)
+    return chunks
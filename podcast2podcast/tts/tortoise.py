@@ -1,43 +1,51 @@
 import abc
+import os
+import subprocess
+import wave
+from functools import lru_cache
 from tempfile import NamedTemporaryFile
 from typing import Literal, Optional
 
 import spacy
+import torch
 import torchaudio
 from loguru import logger
 from pydub import AudioSegment
 
-nlp = spacy.load("en_core_web_sm")
+from podcast2podcast.text import break_up_long_sentence
 
+SAMPLE_RATE = 24000
 
-def break_up_long_sentence(sent: str):
-    """Split texts into reasonable sizes.
+VOICE = "train_mouse"
+VOICE_LATENTS_PATH = os.path.abspath(
+    os.environ.get(
+        "PODCAST2PODCAST_VOICE_LATENTS",
+        os.path.expanduser(
+            os.path.join("~", ".cache", "podcast2podcast", "train_mouse.pt")
+        ),
+    )
+)
 
-    Args:
-        sent (str): A potentially long sentence.
-
-    Examples:
-        >>> break_up_long_sentence(
-        >>>     "It was the best of times, it was the worst of times, it was the age of wisdom, "
-        >>>     "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
-        >>>     "incredulity, it was the season of light, it was the season of darkness, it was "
-        >>>     "the spring of hope, it was the winter of despair."
-        >>> )
-        ["It was the best of times, it was the worst of times, it was the age of wisdom,",
-         "it was the age of foolishness, it was the epoch of belief,",
-         "it was the epoch of incredulity, it was the season of light, it was the season of darkness,",
-         "it was the spring of hope, it was the winter of despair."]
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """Load a spaCy pipeline that only splits sentences.
+
+    The pipeline is loaded once, on first use, so that importing this module
+    (e.g., when using Google TTS) does not pay the cost. The parser and other
+    unused components are excluded in favor of the much faster statistical
+    sentence segmenter.
 
     Returns:
-        List[str]: List of clauses or a sentence of a reasonable size.
+        spacy.language.Language: The sentence-splitting pipeline.
 
     """
-    if sent.count(" ") < 25 or sent.count(",") == 0:
-        return [sent.strip()]
-    clauses = sent.split(",")
-    left = ",".join(clauses[: len(clauses) // 2]).strip() + ","
-    right = ",".join(clauses[len(clauses) // 2 :]).strip()
-    return sum((break_up_long_sentence(s) for s in (left, right)), [])
+    nlp = spacy.load(
+        "en_core_web_sm",
+        exclude=["parser", "tagger", "attribute_ruler", "lemmatizer", "ner"],
+    )
+    nlp.enable_pipe("senter")
+    return nlp
 
 
 class TTSCache(abc.ABC):
@@ -50,17 +58,62 @@ class TTSCache(abc.ABC):
         raise NotImplementedError
 
 
-def tts_gen(
-    transcript: str, preset: str, cache: Optional[TTSCache] = None
-) -> AudioSegment:
+@lru_cache(maxsize=None)
+def load_tortoise():
+    """Load the TorToiSe model and JeremyBot's voice.
+
+    These take several seconds to load, so they are loaded once, on first use,
+    and reused across episodes. The voice's conditioning latents are read from
+    `VOICE_LATENTS_PATH` if it exists (see `scripts/precompute_voice.py`) and
+    are otherwise computed from the voice samples, once rather than per chunk.
+
+    Returns:
+        Tuple[TextToSpeech, Tuple[torch.Tensor, torch.Tensor]]: The model and
+            conditioning latents.
+
+    """
     # importing here to avoid doing so if using WaveNet
     from tortoise.api import TextToSpeech
+
+    # TorToiSe's own half-precision mode only runs the autoregressive model in
+    # fp16, keeping the diffusion model and vocoder in fp32
+    tts = TextToSpeech(half=torch.cuda.is_available())
+    if os.path.exists(VOICE_LATENTS_PATH):
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        mouse_conditioning_latents = torch.load(VOICE_LATENTS_PATH, map_location=device)
+    else:
+        logger.warning(
+            "No precomputed voice latents at {}, computing them from the voice samples",
+            VOICE_LATENTS_PATH,
+        )
+        mouse_conditioning_latents = compute_voice_latents(tts)
+    return tts, mouse_conditioning_latents
+
+
+def compute_voice_latents(tts):
+    """Compute the conditioning latents for JeremyBot's voice.
+
+    Args:
+        tts (TextToSpeech): The TorToiSe model.
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: The conditioning latents.
+
+    """
     from tortoise.utils.audio import load_voice
 
-    tts = TextToSpeech()
-    mouse_voice_samples, mouse_conditioning_latents = load_voice("train_mouse")
+    mouse_voice_samples, mouse_conditioning_latents = load_voice(VOICE)
+    if mouse_conditioning_latents is None:
+        mouse_conditioning_latents = tts.get_conditioning_latents(mouse_voice_samples)
+    return mouse_conditioning_latents
 
-    for sentence in nlp(transcript).sents:
+
+def tts_gen(
+    transcript: str, preset: str, cache: Optional[TTSCache] = None
+) -> AudioSegment:
+    tts, mouse_conditioning_latents = load_tortoise()
+
+    for sentence in get_nlp()(transcript).sents:
         for chunk in break_up_long_sentence(sentence.text):
             logger.info("running tts on: {}", chunk)
             try:
@@ -71,13 +124,18 @@ def tts_gen(
                     speech = tts.tts_with_preset(
                         chunk,
                         preset=preset,
-                        voice_samples=mouse_voice_samples,
                         conditioning_latents=mouse_conditioning_latents,
                     )
                 except AssertionError:
                     raise ValueError("Tortoise cannot deal with long texts.")
                 with NamedTemporaryFile(suffix=".wav") as t:
-                    torchaudio.save(t.name, speech.squeeze(0).cpu(), 24000)
+                    torchaudio.save(
+                        t.name,
+                        speech.squeeze(0).float().cpu(),
+                        SAMPLE_RATE,
+                        encoding="PCM_S",
+                        bits_per_sample=16,
+                    )
                     segment = AudioSegment.from_wav(t.name)
             yield segment
 
@@ -100,3 +158,48 @@ def tts(
     for segment in tts_gen(transcript, preset):
         audio_segments.append(segment)
     return sum(audio_segments)
+
+
+def tts_to_file(
+    transcript,
+    fp_out: str,
+    preset: Literal["ultra_fast", "fast", "standard", "high_quality"] = "high_quality",
+):
+    """Convert a transcript to speech, writing it to a file as it is generated.
+
+    Unlike `tts`, only one chunk of audio is held in memory at a time. Audio is
+    written as WAV; any other output format is encoded from the WAV by ffmpeg,
+    which is multithreaded, using LAME for mp3.
+
+    Args:
+        transcript (str): Transcript.
+        fp_out (str): Path to the output audio file.
+        preset (str, optional): TTS preset. Defaults to "high_quality".
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg could not encode the audio.
+
+    """
+    if fp_out.endswith(".wav"):
+        _tts_to_wav(transcript, fp_out, preset)
+        return
+
+    with NamedTemporaryFile(suffix=".wav") as t:
+        _tts_to_wav(transcript, t.name, preset)
+        codec = ["-codec:a", "libmp3lame"] if fp_out.endswith(".mp3") else []
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-i", t.name]
+            + codec
+            + ["-q:a", "4", "-threads", "0", fp_out],
+            check=True,
+        )
+
+
+def _tts_to_wav(transcript, fp_out, preset):
+    with wave.open(fp_out, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        for segment in tts_gen(transcript, preset):
+            segment = segment.set_channels(1).set_sample_width(2)
+            f.writeframes(segment.set_frame_rate(SAMPLE_RATE).raw_data)
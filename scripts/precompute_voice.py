@@ -0,0 +1,20 @@
+"""Precompute JeremyBot's voice conditioning latents for Tortoise TTS.
+
+Run once from the tortoise-tts checkout, which has the voice samples. The
+latents are saved to `VOICE_LATENTS_PATH` (~/.cache/podcast2podcast/train_mouse.pt,
+or $PODCAST2PODCAST_VOICE_LATENTS if set), after which the voice samples are no
+longer needed at runtime.
+"""
+
+import os
+
+import torch
+from loguru import logger
+from tortoise.api import TextToSpeech
+
+from podcast2podcast.tts.tortoise import VOICE_LATENTS_PATH, compute_voice_latents
+
+if __name__ == "__main__":
+    os.makedirs(os.path.dirname(VOICE_LATENTS_PATH), exist_ok=True)
+    torch.save(compute_voice_latents(TextToSpeech()), VOICE_LATENTS_PATH)
+    logger.info("Saved voice latents to {}", VOICE_LATENTS_PATH)
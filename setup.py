@@ -7,6 +7,7 @@ requirements = [
     "openai",
     "pydub",
     "spacy",
+    "tenacity",
     "toml",
     "tqdm",
     "untangle",
@@ -0,0 +1,32 @@
+import pytest
+
+from podcast2podcast.text import break_up_long_sentence
+
+
+def test_break_up_long_sentence():
+    assert break_up_long_sentence(
+        "It was the best of times, it was the worst of times, it was the age of wisdom, "
+        "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
+        "incredulity, it was the season of light, it was the season of darkness, it was "
+        "the spring of hope, it was the winter of despair."
+    ) == [
+        "It was the best of times, it was the worst of times, it was the age of wisdom,",
+        "it was the age of foolishness, it was the epoch of belief,",
+        "it was the epoch of incredulity, it was the season of light,",
+        "it was the season of darkness, it was the spring of hope, it was the winter "
+        "of despair.",
+    ]
+
+
+@pytest.mark.parametrize(
+    "sent",
+    [
+        "word " * 30 + ", end.",
+        "alpha " * 30 + ", " + "beta " * 30 + ".",
+        "word " * 300 + ".",
+    ],
+)
+def test_break_up_long_sentence_fits_tortoise(sent):
+    chunks = break_up_long_sentence(sent, max_chars=100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "".join("".join(chunks).split()) == "".join(sent.split())